@@ -0,0 +1,231 @@
+import hashlib
+import io
+import os
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlparse
+from ..utils import sanitize_filename
+from .aliyun_oss_uploader import _create_bucket
+import torch
+import numpy as np
+from PIL import Image
+import folder_paths
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.gif', '.tif', '.tiff')
+
+def _parse_object_keys(keys):
+    """Split the keys input into OSS object keys. Full object URLs are reduced to their key."""
+    object_keys = []
+    for item in re.split(r'[,\n]', keys or ''):
+        item = item.strip()
+        if not item:
+            continue
+        if item.startswith(('http://', 'https://')):
+            item = unquote(urlparse(item).path)
+        object_keys.append(item.lstrip('/'))
+    return object_keys
+
+def _download_ranges(bucket_obj, key, size, etag, part_size, range_executor, dest_path=None):
+    """Download an object, splitting it into parallel ranged GETs when it is larger than part_size.
+
+    Parts are written straight to their offset in a preallocated buffer, or in
+    dest_path when given, so no part is ever copied twice. Every GET is pinned
+    to the ETag from head_object, so an object overwritten mid-download fails
+    instead of mixing parts of two versions.
+    """
+    ranges = [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)] or [(0, -1)]
+    headers = {'If-Match': f'"{etag}"'} if etag else None
+
+    def fetch_range(byte_range):
+        start, end = byte_range
+        data = bucket_obj.get_object(key, byte_range=byte_range, headers=headers).read()
+        if len(data) != end - start + 1:
+            raise IOError(f"Short read for {key} bytes {start}-{end}: got {len(data)} bytes")
+        return data
+
+    if dest_path is not None:
+        with open(dest_path, 'wb') as f:
+            f.truncate(size)
+
+        def fetch_to_file(byte_range):
+            data = fetch_range(byte_range) if size else b''
+            with open(dest_path, 'r+b') as f:
+                f.seek(byte_range[0])
+                f.write(data)
+
+        list(range_executor.map(fetch_to_file, ranges))
+        return None
+
+    if len(ranges) == 1:
+        data = bucket_obj.get_object(key, headers=headers).read()
+        if len(data) != size:
+            raise IOError(f"Short read for {key}: got {len(data)} of {size} bytes")
+        return data
+
+    buffer = bytearray(size)
+
+    def fetch_to_buffer(byte_range):
+        start, end = byte_range
+        buffer[start:end + 1] = fetch_range(byte_range)
+
+    list(range_executor.map(fetch_to_buffer, ranges))
+    return buffer
+
+class AliyunOSSDownloader:
+    """ComfyUI node for downloading images and videos from Alibaba Cloud OSS"""
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "keys": ("STRING", {
+                    "default": "",
+                    "multiline": True,
+                    "placeholder": "Object keys or URLs, one per line"
+                }),
+                "endpoint": ("STRING", {
+                    "default": "oss-cn-shanghai.aliyuncs.com",
+                    "multiline": False,
+                    "placeholder": "OSS endpoint (e.g., oss-cn-shanghai.aliyuncs.com)"
+                }),
+                "bucket": ("STRING", {
+                    "default": "cck-sh",
+                    "multiline": False,
+                    "placeholder": "OSS bucket name"
+                }),
+                "access_key": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "Access Key ID"
+                }),
+                "access_secret": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "Access Key Secret"
+                }),
+                "max_workers": ("INT", {
+                    "default": 8,
+                    "min": 1,
+                    "max": 64,
+                    "step": 1,
+                    "placeholder": "Number of concurrent downloads"
+                }),
+                "part_size_mb": ("INT", {
+                    "default": 8,
+                    "min": 1,
+                    "max": 1024,
+                    "step": 1,
+                    "placeholder": "Objects larger than this are fetched as parallel ranged GETs"
+                }),
+                "cache_dir": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "Local cache directory validated by ETag (empty to disable)"
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE", "STRING")
+    RETURN_NAMES = ("IMAGE", "paths")
+    FUNCTION = "download"
+    CATEGORY = "多信通自定义节点"
+
+    def download(self, keys, endpoint, bucket, access_key, access_secret, max_workers, part_size_mb, cache_dir):
+        """Download objects from OSS, decoding images into a batch tensor and saving other files locally"""
+        try:
+            object_keys = _parse_object_keys(keys)
+            if not object_keys:
+                raise ValueError("No object keys given")
+
+            bucket_obj = _create_bucket(endpoint, bucket, access_key, access_secret)
+            part_size = part_size_mb * 1024 * 1024
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            file_dir = cache_dir or os.path.join(folder_paths.get_temp_directory(), "oss_download")
+            os.makedirs(file_dir, exist_ok=True)
+
+            image_keys = [k for k in object_keys if k.lower().endswith(IMAGE_EXTENSIONS)]
+            file_keys = [k for k in object_keys if not k.lower().endswith(IMAGE_EXTENSIONS)]
+
+            # Objects and their ranges use separate pools so an object waiting on its
+            # parts can never starve the workers those parts need.
+            with ThreadPoolExecutor(max_workers=max_workers) as object_executor, \
+                    ThreadPoolExecutor(max_workers=max_workers) as range_executor:
+
+                def fetch(key, as_file):
+                    meta = bucket_obj.head_object(key)
+                    size = meta.content_length
+                    etag = (meta.etag or '').strip('"')
+
+                    name = hashlib.sha1(f"{bucket}/{key}".encode('utf-8')).hexdigest()
+                    if cache_dir:
+                        local_path = os.path.join(cache_dir, name + os.path.splitext(key)[1].lower())
+                        etag_path = local_path + '.etag'
+                        if os.path.exists(local_path) and os.path.exists(etag_path):
+                            with open(etag_path, 'r') as f:
+                                if f.read().strip() == etag:
+                                    print(f"Cache hit for {key}")
+                                    if as_file:
+                                        return local_path
+                                    with open(local_path, 'rb') as f:
+                                        return f.read()
+                    else:
+                        # Keep the original filename readable, prefixed to keep keys from different folders apart
+                        local_path = os.path.join(file_dir, f"{name[:8]}_{sanitize_filename(key) or 'object'}")
+
+                    print(f"Downloading {key} ({size} bytes)")
+                    if as_file or cache_dir:
+                        # Download next to the final path and rename, so a partial file is never served.
+                        # The temp name is unique so concurrent downloads of one key never share it.
+                        temp_path = f"{local_path}.{uuid.uuid4().hex}.part"
+                        if cache_dir and os.path.exists(local_path + '.etag'):
+                            os.remove(local_path + '.etag')
+                        _download_ranges(bucket_obj, key, size, etag, part_size, range_executor, dest_path=temp_path)
+                        os.replace(temp_path, local_path)
+                        if cache_dir:
+                            with open(local_path + '.etag', 'w') as f:
+                                f.write(etag)
+                        if as_file:
+                            return local_path
+                        with open(local_path, 'rb') as f:
+                            return f.read()
+                    return _download_ranges(bucket_obj, key, size, etag, part_size, range_executor)
+
+                # A key listed more than once is fetched once and reused at every position
+                image_futures = {key: object_executor.submit(fetch, key, False) for key in dict.fromkeys(image_keys)}
+                file_futures = {key: object_executor.submit(fetch, key, True) for key in dict.fromkeys(file_keys)}
+
+                # Only headers are parsed here; pixel data is decoded into the batch below
+                pil_images = [Image.open(io.BytesIO(image_futures[key].result())) for key in image_keys]
+                paths = [file_futures[key].result() for key in file_keys]
+
+                if pil_images:
+                    width, height = pil_images[0].size
+                    batch_tensor = torch.empty((len(pil_images), height, width, 3), dtype=torch.float32)
+                    batch_np = batch_tensor.numpy()
+
+                    def decode(i):
+                        img = pil_images[i].convert('RGB')
+                        if img.size != (width, height):
+                            print(f"[WARNING] Resizing {image_keys[i]} from {img.size} to {(width, height)}")
+                            img = img.resize((width, height), Image.LANCZOS)
+                        # Decoded pixels are written straight into the preallocated batch
+                        batch_np[i] = np.asarray(img)
+
+                    list(object_executor.map(decode, range(len(pil_images))))
+                    batch_tensor.div_(255.0)
+                else:
+                    # IMAGE cannot be empty, so downstream nodes get a black placeholder frame
+                    print("[WARNING] No image keys given, returning a black 64x64 placeholder IMAGE")
+                    batch_tensor = torch.zeros((1, 64, 64, 3), dtype=torch.float32)
+
+            print(f"Downloaded {len(pil_images)} images and {len(paths)} files")
+            return (batch_tensor, ','.join(paths))
+
+        except Exception as e:
+            print(f"Error downloading from OSS: {str(e)}")
+            raise e
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional, Tuple
+from ..utils import sanitize_filename
+from .aliyun_oss_uploader import (_build_base_url, _create_bucket, _multipart_upload_with_retry,
+                                  _upload_with_retry)
+import folder_paths
+
+MANIFEST_VERSION = 1
+
+def _scan_directory(root, skip_names=()) -> Dict[str, Tuple[int, int, str]]:
+    """Walk a directory and return {relative posix path: (size, mtime_ns, absolute path)}.
+
+    Only stat() is used, no file contents are read, so rescanning a large tree is cheap.
+    """
+    files = {}
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if current == root and entry.name in skip_names:
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                        rel = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                        files[rel] = (st.st_size, st.st_mtime_ns, entry.path)
+        except OSError as e:
+            print(f"[WARNING] Could not scan {current}: {str(e)}")
+    return files
+
+def _file_md5(local_path, chunk_size=1024 * 1024) -> str:
+    """Hash a file in chunks."""
+    md5 = hashlib.md5()
+    with open(local_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+def _load_manifest(manifest_path, target) -> Dict[str, list]:
+    """Load {relative path: [size, mtime_ns, md5]} entries synced to the given target."""
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Ignoring unreadable manifest {manifest_path}: {str(e)}")
+        return {}
+    # A manifest written for another bucket or path says nothing about this target
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("target") != target:
+        return {}
+    return manifest.get("files", {})
+
+def _save_manifest(manifest_path, target, files):
+    """Write the manifest atomically so an interrupted sync never leaves a corrupt file."""
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": MANIFEST_VERSION, "target": target, "files": files}, f,
+                  ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_path, manifest_path)
+
+def _build_object_key(path, rel) -> Optional[str]:
+    """Map a relative file path to an OSS key, sanitizing each component."""
+    parts = []
+    for part in rel.split('/'):
+        sanitized = sanitize_filename(part)
+        if not sanitized:
+            return None
+        parts.append(sanitized)
+    return '/'.join([path.strip('/')] + parts) if path.strip('/') else '/'.join(parts)
+
+class AliyunOSSDirectorySync:
+    """ComfyUI node for incrementally syncing a local directory to Alibaba Cloud OSS"""
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "directory": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "Local directory (empty for the ComfyUI output directory)"
+                }),
+                "endpoint": ("STRING", {
+                    "default": "oss-cn-shanghai.aliyuncs.com",
+                    "multiline": False,
+                    "placeholder": "OSS endpoint (e.g., oss-cn-shanghai.aliyuncs.com)"
+                }),
+                "bucket": ("STRING", {
+                    "default": "cck-sh",
+                    "multiline": False,
+                    "placeholder": "OSS bucket name"
+                }),
+                "access_key": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "Access Key ID"
+                }),
+                "access_secret": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "Access Key Secret"
+                }),
+                "path": ("STRING", {
+                    "default": "aigc/up",
+                    "multiline": False,
+                    "placeholder": "OSS path (e.g., aigc/up)"
+                }),
+                "max_workers": ("INT", {
+                    "default": 8,
+                    "min": 1,
+                    "max": 64,
+                    "step": 1,
+                    "placeholder": "Number of concurrent uploads"
+                }),
+                "multipart_threshold_mb": ("INT", {
+                    "default": 64,
+                    "min": 1,
+                    "max": 4096,
+                    "step": 1,
+                    "placeholder": "Files larger than this are uploaded in parallel parts"
+                }),
+                "manifest_name": ("STRING", {
+                    "default": ".oss_sync_manifest.json",
+                    "multiline": False,
+                    "placeholder": "Manifest filename stored in the synced directory"
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("urls", "summary")
+    FUNCTION = "sync_directory"
+    CATEGORY = "多信通自定义节点"
+
+    def sync_directory(self, directory, endpoint, bucket, access_key, access_secret, path,
+                       max_workers, multipart_threshold_mb, manifest_name):
+        """Upload new or changed files of a directory to OSS and return their URLs"""
+        try:
+            root = os.path.abspath(directory or folder_paths.get_output_directory())
+            if not os.path.isdir(root):
+                return (f"Error: Directory does not exist: {root}", "")
+
+            manifest_name = sanitize_filename(manifest_name) or ".oss_sync_manifest.json"
+            manifest_path = os.path.join(root, manifest_name)
+            target = f"{endpoint}/{bucket}/{path.strip('/')}"
+
+            previous = _load_manifest(manifest_path, target)
+            current = _scan_directory(root, skip_names=(manifest_name, manifest_name + '.tmp'))
+
+            # Files whose size and mtime match the manifest are skipped without being read
+            files = {}
+            pending = []
+            for rel, (size, mtime_ns, local_path) in current.items():
+                entry = previous.get(rel)
+                if entry and entry[0] == size and entry[1] == mtime_ns:
+                    files[rel] = entry
+                else:
+                    pending.append(rel)
+            print(f"Scanned {len(current)} files in {root}, {len(pending)} new or changed")
+
+            bucket_obj = _create_bucket(endpoint, bucket, access_key, access_secret)
+            base_url = _build_base_url(endpoint, bucket)
+            multipart_threshold = multipart_threshold_mb * 1024 * 1024
+
+            def sync_file(rel):
+                size, mtime_ns, local_path = current[rel]
+                md5 = _file_md5(local_path)
+                entry = [size, mtime_ns, md5]
+
+                # Touched but unchanged content does not need another upload
+                old_entry = previous.get(rel)
+                if old_entry and old_entry[2] == md5:
+                    return entry, None
+
+                oss_path = _build_object_key(path, rel)
+                if not oss_path:
+                    raise ValueError(f"Invalid file path: {rel}")
+                if size >= multipart_threshold:
+                    # Parts never exceed the threshold, so files just above it are still split
+                    _multipart_upload_with_retry(bucket_obj, oss_path, local_path,
+                                                 part_size=min(8 * 1024 * 1024, multipart_threshold))
+                else:
+                    _upload_with_retry(bucket_obj, oss_path, local_path)
+                return entry, f"{base_url}/{oss_path}"
+
+            uploaded = {}
+            failed = []
+            try:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {executor.submit(sync_file, rel): rel for rel in pending}
+                    for future in as_completed(futures):
+                        rel = futures[future]
+                        try:
+                            entry, file_url = future.result()
+                        except Exception as e:
+                            # Left out of the manifest so the next sync retries it
+                            print(f"Failed to sync {rel}: {str(e)}")
+                            failed.append(rel)
+                            continue
+                        files[rel] = entry
+                        if file_url:
+                            uploaded[rel] = file_url
+            finally:
+                # Record progress even if the sync is interrupted part way
+                _save_manifest(manifest_path, target, files)
+
+            urls = [uploaded[rel] for rel in sorted(uploaded)]
+            summary = (f"scanned: {len(current)}, uploaded: {len(uploaded)}, "
+                       f"unchanged: {len(current) - len(uploaded) - len(failed)}, failed: {len(failed)}")
+            if failed:
+                summary += "\nfailed files: " + ','.join(sorted(failed))
+            print(f"Directory sync finished: {summary}")
+
+            # Join URLs with comma separator
+            return (','.join(urls), summary)
+
+        except Exception as e:
+            print(f"Error syncing directory to OSS: {str(e)}")
+            return (f"Error: {str(e)}", "")
@@ -1,7 +1,11 @@
+import io
+import json
 import os
 import random
+import re
 import string
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Tuple, Union
 from ..utils import sanitize_filename
@@ -30,6 +34,82 @@ def _upload_with_retry(bucket_obj, oss_path, local_path, max_retries=20, retry_d
                 print("Max retries reached. Upload failed.")
                 raise e
 
+def _put_bytes_with_retry(bucket_obj, oss_path, data, max_retries=20, retry_delay=3):
+    """Upload in-memory data to OSS with retry mechanism."""
+    for attempt in range(max_retries):
+        try:
+            bucket_obj.put_object(oss_path, data)
+            print(f"Successfully uploaded {len(data)} bytes to {oss_path} on attempt {attempt + 1}")
+            return
+        except Exception as e:
+            print(f"Upload attempt {attempt + 1}/{max_retries} failed: {str(e)}")
+            if attempt + 1 < max_retries:
+                print(f"Retrying in {retry_delay} seconds...")
+                time.sleep(retry_delay)
+            else:
+                print("Max retries reached. Upload failed.")
+                raise e
+
+def _multipart_upload_with_retry(bucket_obj, oss_path, local_path, part_size=8 * 1024 * 1024, num_threads=4,
+                                 max_retries=20, retry_delay=3):
+    """Upload a large file to OSS in parallel parts with retry mechanism. Finished parts are resumed on retry."""
+    # The caller already decided this file goes multipart, so never let oss2 fall back to a single PUT.
+    # determine_part_size grows the part size only when needed to stay within the OSS part count limit.
+    part_size = oss2.determine_part_size(os.path.getsize(local_path), preferred_size=part_size)
+    for attempt in range(max_retries):
+        try:
+            oss2.resumable_upload(bucket_obj, oss_path, local_path, multipart_threshold=0,
+                                  part_size=part_size, num_threads=num_threads)
+            print(f"Successfully uploaded {local_path} to {oss_path} on attempt {attempt + 1}")
+            return
+        except Exception as e:
+            print(f"Multipart upload attempt {attempt + 1}/{max_retries} failed: {str(e)}")
+            if attempt + 1 < max_retries:
+                print(f"Retrying in {retry_delay} seconds...")
+                time.sleep(retry_delay)
+            else:
+                print("Max retries reached. Upload failed.")
+                raise e
+
+def _create_bucket(endpoint, bucket, access_key, access_secret):
+    """Create an OSS bucket client from the node inputs."""
+    auth = oss2.Auth(access_key, access_secret)
+    return oss2.Bucket(auth, endpoint, bucket)
+
+def _build_base_url(endpoint, bucket):
+    """Build the public base URL of a bucket from the endpoint input."""
+    if endpoint.startswith('https://'):
+        return endpoint.replace('https://', f'https://{bucket}.')
+    elif endpoint.startswith('http://'):
+        return endpoint.replace('http://', f'http://{bucket}.')
+    return f'https://{bucket}.{endpoint}'
+
+def _parse_image_variants(variants):
+    """Parse a variants input like "thumb:256,preview:1024,original" into [(name, max_side or None)]."""
+    parsed = []
+    for item in re.split(r'[,\n]', variants or ''):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, max_side = item.partition(':')
+        name = name.strip()
+        if not re.fullmatch(r'[A-Za-z0-9_-]+', name):
+            raise ValueError(f"Invalid variant name: {name!r}")
+        # Duplicate names would upload to the same key and lose a URL in the grouped output
+        if any(name == existing for existing, _ in parsed):
+            raise ValueError(f"Duplicate variant name: {name!r}")
+        if name == 'original':
+            if max_side.strip():
+                raise ValueError("The original variant does not take a size")
+            parsed.append((name, None))
+        elif max_side.strip().isdigit() and int(max_side) > 0:
+            parsed.append((name, int(max_side)))
+        else:
+            raise ValueError(f"Variant {name!r} needs a size, e.g. {name}:512")
+    return parsed or [('original', None)]
+
+IMAGE_VARIANT_FORMATS = {"JPEG": ".jpg", "WEBP": ".webp", "PNG": ".png"}
+
 class AliyunOSSImageUploader:
     """ComfyUI node for uploading images to Alibaba Cloud OSS"""
     
@@ -74,11 +154,21 @@ class AliyunOSSImageUploader:
                     "multiline": False,
                     "placeholder": "Filename (only used when random_filename is False)"
                 }),
+            },
+            "optional": {
+                "variants": ("STRING", {
+                    "default": "original",
+                    "multiline": False,
+                    "placeholder": "Variants to upload, e.g. thumb:256,preview:1024,original"
+                }),
+                "variant_format": (list(IMAGE_VARIANT_FORMATS), {
+                    "default": "JPEG"
+                }),
             }
         }
     
-    RETURN_TYPES = ("STRING",)
-    RETURN_NAMES = ("urls",)
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("urls", "variant_urls")
     FUNCTION = "upload_image"
     CATEGORY = "多信通自定义节点"
     
@@ -89,44 +179,34 @@ class AliyunOSSImageUploader:
         return f"{timestamp}_{random_str}.{extension}"
     
     def upload_image(self, IMAGE, endpoint, bucket, access_key, access_secret, path, 
-                     random_filename, filename):
-        """Upload images to OSS and return URLs"""
+                     random_filename, filename, variants="original", variant_format="JPEG"):
+        """Upload images and their resized variants to OSS and return URLs"""
         try:
-            urls = []
+            variant_specs = _parse_image_variants(variants)
             
             # Handle both single image and batch images
             images = []
             if isinstance(IMAGE, torch.Tensor):
-                if len(IMAGE.shape) == 4:
-                    # Batch of images (B, C, H, W)
-                    for i in range(IMAGE.shape[0]):
-                        img_tensor = IMAGE[i]
-                        if img_tensor.shape[0] == 3:
-                            img_tensor = img_tensor.permute(1, 2, 0)
-                        image_np = (img_tensor.cpu().numpy() * 255).astype(np.uint8)
-                        images.append(Image.fromarray(image_np))
-                else:
+                if len(IMAGE.shape) == 3:
                     # Single image (C, H, W) or (H, W, C)
-                    if IMAGE.shape[0] == 3:
-                        IMAGE = IMAGE.permute(1, 2, 0)
-                    image_np = (IMAGE.cpu().numpy() * 255).astype(np.uint8)
-                    images.append(Image.fromarray(image_np))
+                    IMAGE = IMAGE.unsqueeze(0)
+                if IMAGE.shape[1] == 3:
+                    # Batch of channels-first images (B, C, H, W)
+                    IMAGE = IMAGE.permute(0, 2, 3, 1)
+                # Convert the whole batch to uint8 once; every variant is derived from it
+                images_np = (IMAGE.cpu().numpy() * 255).astype(np.uint8)
+                images = [Image.fromarray(image_np) for image_np in images_np]
             else:
                 # Single PIL image
                 images.append(IMAGE)
             
-            auth = oss2.Auth(access_key, access_secret)
-            bucket_obj = oss2.Bucket(auth, endpoint, bucket)
+            bucket_obj = _create_bucket(endpoint, bucket, access_key, access_secret)
             
             # Construct base URL
-            if endpoint.startswith('https://'):
-                base_url = endpoint.replace('https://', f'https://{bucket}.')
-            elif endpoint.startswith('http://'):
-                base_url = endpoint.replace('http://', f'http://{bucket}.')
-            else:
-                base_url = f'https://{bucket}.{endpoint}'
+            base_url = _build_base_url(endpoint, bucket)
             
-            # Upload each image
+            # One task per image and variant, all sharing the image's base filename
+            tasks = []
             for i, pil_image in enumerate(images):
                 # Generate filename for this image
                 current_filename = filename
@@ -151,24 +231,52 @@ class AliyunOSSImageUploader:
                     if not current_filename.lower().endswith(('.png', '.jpg', '.jpeg', '.webp')):
                         current_filename += '.png'
                 
-                oss_path = os.path.join(path, current_filename).replace('\\', '/')
-                temp_path = os.path.join(folder_paths.get_temp_directory(), current_filename)
-                
-                pil_image.save(temp_path, 'PNG')
-                _upload_with_retry(bucket_obj, oss_path, temp_path)
-                os.remove(temp_path)
-                
-                file_url = f"{base_url}/{oss_path}"
-                urls.append(file_url)
-                print(f"Image {i+1}/{len(images)} uploaded successfully to: {file_url}")
+                name, _ = os.path.splitext(current_filename)
+                for variant, max_side in variant_specs:
+                    if max_side is None:
+                        variant_filename = current_filename
+                    else:
+                        # Variants are siblings of the original: image.png -> image_thumb.jpg
+                        variant_filename = f"{name}_{variant}{IMAGE_VARIANT_FORMATS[variant_format]}"
+                    oss_path = os.path.join(path, variant_filename).replace('\\', '/')
+                    tasks.append((i, variant, max_side, oss_path))
+            
+            def encode_and_upload(task):
+                i, variant, max_side, oss_path = task
+                pil_image = images[i]
+                buffer = io.BytesIO()
+                if max_side is None:
+                    pil_image.save(buffer, 'PNG')
+                else:
+                    # thumbnail() keeps the aspect ratio and never upscales
+                    variant_image = pil_image.copy()
+                    variant_image.thumbnail((max_side, max_side), Image.LANCZOS)
+                    if variant_format == "JPEG":
+                        variant_image = variant_image.convert('RGB')
+                    variant_image.save(buffer, variant_format, quality=85)
+                _put_bytes_with_retry(bucket_obj, oss_path, buffer.getvalue())
+                return f"{base_url}/{oss_path}"
+            
+            # PIL releases the GIL while encoding, so encoding and uploads overlap across threads
+            with ThreadPoolExecutor(max_workers=min(len(tasks), 8)) as executor:
+                task_urls = list(executor.map(encode_and_upload, tasks))
+            
+            grouped = [{} for _ in images]
+            for (i, variant, _, _), file_url in zip(tasks, task_urls):
+                grouped[i][variant] = file_url
+            for i, image_urls in enumerate(grouped):
+                print(f"Image {i+1}/{len(images)} uploaded successfully to: {image_urls}")
+            
+            # The primary URL of each image is the original when uploaded, else its first variant
+            urls = [image_urls.get('original', next(iter(image_urls.values()))) for image_urls in grouped]
             
             # Join URLs with comma separator
             urls_str = ','.join(urls)
-            return (urls_str,)
+            return (urls_str, json.dumps(grouped, ensure_ascii=False))
             
         except Exception as e:
             print(f"Error uploading images to OSS: {str(e)}")
-            return (f"Error: {str(e)}",)
+            return (f"Error: {str(e)}", "")
 
 class AliyunOSSVideoUploader:
     """ComfyUI node for uploading videos to Alibaba Cloud OSS"""
@@ -271,19 +379,13 @@ class AliyunOSSVideoUploader:
                 if not filename.lower().endswith(('.mp4', '.avi', '.mov', '.webm', '.mkv')):
                     filename += ext
 
-            auth = oss2.Auth(access_key, access_secret)
-            bucket_obj = oss2.Bucket(auth, endpoint, bucket)
+            bucket_obj = _create_bucket(endpoint, bucket, access_key, access_secret)
             
             oss_path = os.path.join(path, filename).replace('\\', '/')
             
             _upload_with_retry(bucket_obj, oss_path, video_path)
             
-            if endpoint.startswith('https://'):
-                base_url = endpoint.replace('https://', f'https://{bucket}.')
-            elif endpoint.startswith('http://'):
-                base_url = endpoint.replace('http://', f'http://{bucket}.')
-            else:
-                base_url = f'https://{bucket}.{endpoint}'
+            base_url = _build_base_url(endpoint, bucket)
             
             file_url = f"{base_url}/{oss_path}"
             
@@ -389,8 +491,7 @@ class  AliyunOSSAudioUploader:
             scipy.io.wavfile.write(temp_path, sample_rate, waveform_np)
 
             # Setup OSS auth and upload
-            auth = oss2.Auth(access_key, access_secret)
-            bucket_obj = oss2.Bucket(auth, endpoint, bucket)
+            bucket_obj = _create_bucket(endpoint, bucket, access_key, access_secret)
             oss_path = os.path.join(path, filename).replace('\\', '/')
             
             _upload_with_retry(bucket_obj, oss_path, temp_path)
@@ -398,12 +499,7 @@ class  AliyunOSSAudioUploader:
             os.remove(temp_path)
             
             # Construct URL
-            if endpoint.startswith('https://'):
-                base_url = endpoint.replace('https://', f'https://{bucket}.')
-            elif endpoint.startswith('http://'):
-                base_url = endpoint.replace('http://', f'http://{bucket}.')
-            else:
-                base_url = f'https://{bucket}.{endpoint}'
+            base_url = _build_base_url(endpoint, bucket)
             
             file_url = f"{base_url}/{oss_path}"
             
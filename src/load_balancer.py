@@ -0,0 +1,265 @@
+"""
+Endpoint pool with load balancing and health checking for remote API nodes.
+"""
+import json
+import random
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+
+BALANCE_STRATEGIES = ["least_outstanding", "latency_weighted"]
+
+
+def parse_endpoints(api_url: str) -> List[str]:
+    """
+    Split an api_url input into a list of endpoints.
+
+    Endpoints may be separated by commas or newlines. Duplicates are
+    dropped while keeping the original order.
+
+    Examples:
+        >>> parse_endpoints("http://a/v1, http://b/v1")
+        ['http://a/v1', 'http://b/v1']
+    """
+    endpoints = [url.strip() for url in re.split(r'[,\n]', api_url or '') if url.strip()]
+    return list(dict.fromkeys(endpoints))
+
+
+class Backend:
+    """Runtime state and statistics of a single endpoint"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.total_requests = 0
+        self.total_failures = 0
+        self.consecutive_failures = 0
+        self.ewma_latency: Optional[float] = None
+        self.healthy = True
+        self.ejected_until = 0.0
+        self.ejections = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.total_requests,
+            "failures": self.total_failures,
+            "consecutive_failures": self.consecutive_failures,
+            "ewma_latency": round(self.ewma_latency, 3) if self.ewma_latency is not None else None,
+            "ejections": self.ejections,
+        }
+
+
+class EndpointPool:
+    """
+    A set of identical backends with request routing and health checking.
+
+    Requests are routed by least outstanding requests or latency-weighted
+    random selection. Backends are ejected passively after consecutive
+    request failures and actively when a probe cannot connect; an ejected backend
+    is probed again once its ejection time has passed and put back into
+    rotation as soon as it answers or serves a request. A pool with a
+    single backend never ejects it.
+    """
+
+    def __init__(self, endpoints: List[str], failure_threshold: int = 3, ejection_time: float = 30.0,
+                 max_ejection_time: float = 300.0, probe_interval: float = 10.0, probe_timeout: float = 5.0,
+                 ewma_alpha: float = 0.3, idle_timeout: float = 600.0):
+        if not endpoints:
+            raise ValueError("At least one API endpoint URL is required")
+
+        self.backends = [Backend(url) for url in endpoints]
+        self.failure_threshold = failure_threshold
+        self.ejection_time = ejection_time
+        self.max_ejection_time = max_ejection_time
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.ewma_alpha = ewma_alpha
+        self.idle_timeout = idle_timeout
+
+        self._lock = threading.Lock()
+        self._prober: Optional[threading.Thread] = None
+        self._last_used = time.monotonic()
+
+    def acquire(self, strategy: str = "least_outstanding", exclude=()) -> Backend:
+        """Pick a backend for the next request and count it as outstanding"""
+        with self._lock:
+            self._last_used = time.monotonic()
+            candidates = [b for b in self.backends if b.healthy and b.url not in exclude]
+            if not candidates:
+                # Every backend is ejected: rather than failing outright, try the
+                # remaining ones in order of fewest consecutive failures.
+                candidates = sorted((b for b in self.backends if b.url not in exclude),
+                                    key=lambda b: b.consecutive_failures)[:1]
+            if not candidates:
+                raise RuntimeError("No backend available")
+
+            if strategy == "latency_weighted":
+                backend = self._pick_latency_weighted(candidates)
+            else:
+                backend = self._pick_least_outstanding(candidates)
+
+            backend.outstanding += 1
+            backend.total_requests += 1
+
+        self._ensure_prober()
+        return backend
+
+    def release(self, backend: Backend, latency: Optional[float] = None, success: bool = True):
+        """Record the outcome of a request acquired from this pool"""
+        with self._lock:
+            backend.outstanding = max(0, backend.outstanding - 1)
+            if success:
+                backend.consecutive_failures = 0
+                if not backend.healthy:
+                    # An ejected backend that answers again (e.g. via the all-ejected fallback) has recovered
+                    backend.healthy = True
+                    backend.ejected_until = 0.0
+                    print(f"Backend {backend.url} is healthy again")
+                if latency is not None:
+                    if backend.ewma_latency is None:
+                        backend.ewma_latency = latency
+                    else:
+                        backend.ewma_latency += self.ewma_alpha * (latency - backend.ewma_latency)
+            else:
+                backend.total_failures += 1
+                backend.consecutive_failures += 1
+                # A single backend is never ejected: there is nothing to fail over to
+                if (len(self.backends) > 1 and backend.healthy
+                        and backend.consecutive_failures >= self.failure_threshold):
+                    self._eject(backend)
+
+    def request(self, send: Callable[[str], object], strategy: str = "least_outstanding"):
+        """
+        Run send(url) against a selected backend.
+
+        Failed attempts are retried on the other backends. Client errors
+        (HTTP 4xx other than 429) are raised immediately since another
+        backend would reject the same request.
+        """
+        tried = set()
+        last_error: Optional[Exception] = None
+        for _ in range(len(self.backends)):
+            backend = self.acquire(strategy, exclude=tried)
+            start = time.monotonic()
+            try:
+                result = send(backend.url)
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status is not None and 400 <= status < 500 and status != 429:
+                    self.release(backend, success=True)
+                    raise e
+                self.release(backend, success=False)
+                last_error = e
+            except Exception as e:
+                self.release(backend, success=False)
+                last_error = e
+            else:
+                self.release(backend, time.monotonic() - start, success=True)
+                return result
+
+            tried.add(backend.url)
+            print(f"Backend {backend.url} failed: {str(last_error)}")
+
+        raise last_error
+
+    def stats(self) -> List[Dict]:
+        """Return a snapshot of per-backend statistics"""
+        with self._lock:
+            return [b.to_dict() for b in self.backends]
+
+    def stats_json(self) -> str:
+        return json.dumps(self.stats(), ensure_ascii=False)
+
+    def _pick_least_outstanding(self, candidates: List[Backend]) -> Backend:
+        fewest = min(b.outstanding for b in candidates)
+        tied = [b for b in candidates if b.outstanding == fewest]
+        return random.choice(tied)
+
+    def _pick_latency_weighted(self, candidates: List[Backend]) -> Backend:
+        known = [b.ewma_latency for b in candidates if b.ewma_latency is not None]
+        # Backends without measurements yet get the best known latency so they are explored
+        default_latency = min(known) if known else 1.0
+        weights = []
+        for b in candidates:
+            latency = b.ewma_latency if b.ewma_latency is not None else default_latency
+            weights.append(1.0 / (max(latency, 1e-3) * (b.outstanding + 1)))
+        return random.choices(candidates, weights=weights, k=1)[0]
+
+    def _eject(self, backend: Backend):
+        """Take a backend out of rotation. Caller must hold the lock."""
+        backend.ejections += 1
+        backend.healthy = False
+        backoff = self.ejection_time * (2 ** min(backend.ejections - 1, 10))
+        backend.ejected_until = time.monotonic() + min(backoff, self.max_ejection_time)
+        print(f"Ejected backend {backend.url} for {min(backoff, self.max_ejection_time):.0f}s "
+              f"after {backend.consecutive_failures} consecutive failures")
+
+    def _ensure_prober(self):
+        """Start the active health check thread if it is not running"""
+        if len(self.backends) < 2:
+            return
+        with self._lock:
+            if self._prober is not None and self._prober.is_alive():
+                return
+            self._prober = threading.Thread(target=self._probe_loop, daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self):
+        # Stop once the pool has not been used for a while; the next acquire restarts it
+        while time.monotonic() - self._last_used < self.idle_timeout:
+            time.sleep(self.probe_interval)
+            for backend in self.backends:
+                if not backend.healthy and time.monotonic() < backend.ejected_until:
+                    continue
+                alive = self._probe(backend.url)
+                with self._lock:
+                    if alive and not backend.healthy:
+                        backend.healthy = True
+                        backend.consecutive_failures = 0
+                        print(f"Backend {backend.url} is healthy again")
+                    elif not alive and backend.healthy:
+                        backend.consecutive_failures += 1
+                        if backend.consecutive_failures >= self.failure_threshold:
+                            self._eject(backend)
+                    elif not alive:
+                        self._eject(backend)
+
+    def _probe(self, url: str) -> bool:
+        """
+        A backend is alive if it answers at all.
+
+        The probe is an unauthenticated GET to an endpoint that only accepts
+        POST, so any HTTP status, including 5xx from a gateway, counts as
+        alive; only connection errors and timeouts count as dead. Server
+        errors on real requests are still caught by the passive check.
+        """
+        try:
+            requests.get(url, timeout=self.probe_timeout)
+            return True
+        except (requests.ConnectionError, requests.Timeout):
+            return False
+        except Exception:
+            # Anything else (e.g. an invalid URL) says nothing about reachability
+            return True
+
+
+_pools: Dict[Tuple[str, ...], EndpointPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_endpoint_pool(api_url: str) -> EndpointPool:
+    """Return the shared pool for an api_url input so stats and health persist across executions"""
+    endpoints = tuple(parse_endpoints(api_url))
+    with _pools_lock:
+        pool = _pools.get(endpoints)
+        if pool is None:
+            pool = EndpointPool(list(endpoints))
+            _pools[endpoints] = pool
+        return pool
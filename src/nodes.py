@@ -1,6 +1,9 @@
 from .cloud.aliyun_oss_uploader import *
+from .cloud.aliyun_oss_sync import AliyunOSSDirectorySync
+from .cloud.aliyun_oss_downloader import AliyunOSSDownloader
 from .remote_t2i import RemoteT2iGenerator
 from .vlm_helper import VLMHelperNode
+from .prompt_pipeline import PromptToImagePipeline
 
 # A dictionary that contains all nodes you want to export with their names
 # NOTE: names should be globally unique
@@ -9,14 +12,20 @@ NODE_CLASS_MAPPINGS = {
     "AliyunOSSImageUploader": AliyunOSSImageUploader,
     "AliyunOSSVideoUploader": AliyunOSSVideoUploader,
     "AliyunOSSAudioUploader": AliyunOSSAudioUploader,
+    "AliyunOSSDirectorySync": AliyunOSSDirectorySync,
+    "AliyunOSSDownloader": AliyunOSSDownloader,
     "RemoteT2iGenerator": RemoteT2iGenerator,
-    "VLMHelperNode": VLMHelperNode
+    "VLMHelperNode": VLMHelperNode,
+    "PromptToImagePipeline": PromptToImagePipeline
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "AliyunOSSImageUploader": "阿里云OSS图片上传",
     "AliyunOSSVideoUploader": "阿里云OSS视频上传",
     "AliyunOSSAudioUploader": "阿里云OSS音频上传",
+    "AliyunOSSDirectorySync": "阿里云OSS目录增量同步",
+    "AliyunOSSDownloader": "阿里云OSS下载",
     "RemoteT2iGenerator": "远程文生图openai兼容图像生成",
-    "VLMHelperNode": "VLM提示词助手"
+    "VLMHelperNode": "VLM提示词助手",
+    "PromptToImagePipeline": "提示词改写并生成图像"
 }
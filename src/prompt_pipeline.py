@@ -0,0 +1,106 @@
+import torch
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .load_balancer import BALANCE_STRATEGIES, get_endpoint_pool
+from .remote_t2i import RemoteT2iGenerator
+from .vlm_helper import VLMHelperNode
+
+
+class PromptToImagePipeline:
+    """ComfyUI node that rewrites a prompt with the VLM and generates images in one execution"""
+
+    def __init__(self):
+        self.vlm = VLMHelperNode()
+        self.t2i = RemoteT2iGenerator()
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        vlm_inputs = VLMHelperNode.INPUT_TYPES()["required"]
+        t2i_inputs = RemoteT2iGenerator.INPUT_TYPES()["required"]
+        return {
+            "required": {
+                "prompt": vlm_inputs["prompt"],
+                "variants": ("INT", {
+                    "default": 4,
+                    "min": 1,
+                    "max": 10,
+                    "step": 1,
+                    "placeholder": "Number of prompt variants, one image per variant"
+                }),
+                "vlm_model": vlm_inputs["model"],
+                "system_prompt": vlm_inputs["system_prompt"],
+                "vlm_api_key": vlm_inputs["api_key"],
+                "vlm_api_url": vlm_inputs["api_url"],
+                "t2i_model": t2i_inputs["model"],
+                "size": t2i_inputs["size"],
+                "t2i_token": t2i_inputs["token"],
+                "t2i_api_url": t2i_inputs["api_url"],
+            },
+            "optional": {
+                "balance_strategy": (BALANCE_STRATEGIES, {
+                    "default": "least_outstanding"
+                })
+            },
+        }
+
+    RETURN_TYPES = ("IMAGE", "STRING")
+    RETURN_NAMES = ("IMAGE", "prompts")
+    FUNCTION = "run_pipeline"
+    CATEGORY = "多信通自定义节点"
+
+    def run_pipeline(self, prompt, variants, vlm_model, system_prompt, vlm_api_key, vlm_api_url,
+                     t2i_model, size, t2i_token, t2i_api_url, balance_strategy="least_outstanding"):
+        """Request prompt variants and chain an image request onto each one as it completes"""
+        try:
+            vlm_pool = get_endpoint_pool(vlm_api_url)
+            t2i_pool = get_endpoint_pool(t2i_api_url)
+
+            headers = {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {t2i_token}"
+            }
+
+            prompts = [None] * variants
+            images = [None] * variants
+
+            # Both stages share one executor: at most `variants` VLM requests and
+            # `variants` image requests are in flight at the same time.
+            with ThreadPoolExecutor(max_workers=variants * 2) as executor:
+                vlm_futures = {
+                    executor.submit(self.vlm._request_completion, vlm_pool, balance_strategy,
+                                    self._variant_prompt(prompt, i, variants), vlm_model, system_prompt,
+                                    vlm_api_key): i
+                    for i in range(variants)
+                }
+
+                image_futures = {}
+                for future in as_completed(vlm_futures):
+                    i = vlm_futures[future]
+                    variant = future.result()
+                    if not variant:
+                        raise ValueError(f"No response from VLM API for variant {i}")
+
+                    # Generation models take a single line prompt
+                    prompts[i] = " ".join(variant.split())
+                    print(f"Variant {i}: {prompts[i]}")
+                    image_futures[executor.submit(self.t2i._request_image, t2i_pool, balance_strategy,
+                                                  headers, t2i_model, prompts[i], size, i)] = i
+
+                for future in as_completed(image_futures):
+                    images[image_futures[future]] = future.result()
+
+            batch_tensor = torch.stack(images)
+            print(f"Final batch tensor shape: {batch_tensor.shape}, dtype: {batch_tensor.dtype}")
+
+            # One prompt per line, in the same order as the image batch
+            return (batch_tensor, "\n".join(prompts))
+
+        except Exception as e:
+            print(f"Error running prompt to image pipeline: {str(e)}")
+            raise e
+
+    def _variant_prompt(self, prompt, index, variants):
+        """Ask for a distinct take on the prompt so the variants do not collapse into the same rewrite"""
+        if variants == 1:
+            return prompt
+        return (f"{prompt}\n\n(Variation {index + 1} of {variants}: produce a distinct variation that differs "
+                f"from the others in composition, camera angle, lighting and style, while keeping the same subject.)")
@@ -6,6 +6,7 @@ import numpy as np
 from PIL import Image
 from typing import List
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from .load_balancer import BALANCE_STRATEGIES, get_endpoint_pool
 
 class RemoteT2iGenerator:
     """ComfyUI node for generating images using remote Flux1 model"""
@@ -47,19 +48,27 @@ class RemoteT2iGenerator:
                 "api_url": ("STRING", {
                     "default": "https://api.kyle.moments8.com/dxtflux1schnell/v1/images/generations",
                     "multiline": False,
-                    "placeholder": "API endpoint URL"
+                    "placeholder": "API endpoint URL(s), separate multiple backends with commas"
+                })
+            },
+            "optional": {
+                "balance_strategy": (BALANCE_STRATEGIES, {
+                    "default": "least_outstanding"
                 })
             },
         }
     
-    RETURN_TYPES = ("IMAGE", "STRING")
-    RETURN_NAMES = ("IMAGE", "url")
+    RETURN_TYPES = ("IMAGE", "STRING", "STRING")
+    RETURN_NAMES = ("IMAGE", "url", "backend_stats")
     FUNCTION = "generate_images"
     CATEGORY = "多信通自定义节点"
     
-    def generate_images(self, token, model, prompt, size, batch_size, api_url):
+    def generate_images(self, token, model, prompt, size, batch_size, api_url,
+                        balance_strategy="least_outstanding"):
         """Generate images using remote Flux1 model with concurrent requests"""
         try:
+            pool = get_endpoint_pool(api_url)
+
             # Prepare request headers
             headers = {
                 "Content-Type": "application/json",
@@ -68,44 +77,7 @@ class RemoteT2iGenerator:
 
             # Function to handle a single API request
             def single_request(request_id):
-                payload = {
-                    "model": model,
-                    "prompt": prompt,
-                    "n": 1,  # Each request generates 1 image
-                    "size": size
-                }
-
-                print(f"Request {request_id}: Sending request to {api_url} with payload: {payload}")
-                response = requests.post(api_url, headers=headers, json=payload, timeout=60)
-                response.raise_for_status()
-
-                result = response.json()
-                print(f"Request {request_id}: Received response")
-
-                # Extract base64 images from response
-                for img_data in result.get("data", []):
-                    base64_str = img_data.get("b64_json", "")
-                    if base64_str:
-                        # Decode base64 string to image
-                        img_bytes = base64.b64decode(base64_str)
-                        img = Image.open(io.BytesIO(img_bytes))
-
-                        print(f"Request {request_id}: PIL image size: {img.size}, mode: {img.mode}")
-
-                        # Convert PIL image to torch tensor
-                        img_array = np.array(img).astype(np.float32) / 255.0
-                        print(f"Request {request_id}: Image array shape: {img_array.shape}, dtype: {img_array.dtype}")
-
-                        # Create tensor with batch dimension (BHWC format)
-                        img_tensor = torch.from_numpy(img_array)
-                        print(f"Request {request_id}: Image tensor shape: {img_tensor.shape}, dtype: {img_tensor.dtype}")
-
-                        # Ensure tensor is contiguous and on CPU
-                        img_tensor = img_tensor.contiguous().cpu()
-
-                        return img_tensor
-
-                raise ValueError(f"No images generated from API response for request {request_id}")
+                return self._request_image(pool, balance_strategy, headers, model, prompt, size, request_id)
 
             # Execute concurrent requests
             images = []
@@ -135,9 +107,52 @@ class RemoteT2iGenerator:
             print(f"Final batch tensor min: {batch_tensor.min()}, max: {batch_tensor.max()}")
             print(f"Final batch tensor is_contiguous: {batch_tensor.is_contiguous()}")
 
-            # Return images tensor and API URL
-            return (batch_tensor, api_url)
+            # Return images tensor, API URL and per-backend statistics
+            return (batch_tensor, api_url, pool.stats_json())
 
         except Exception as e:
             print(f"Error generating images: {str(e)}")
             raise e
+
+    def _request_image(self, pool, balance_strategy, headers, model, prompt, size, request_id):
+        """Send a single generation request and decode the returned image into an HWC tensor"""
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "n": 1,  # Each request generates 1 image
+            "size": size
+        }
+
+        def send(url):
+            print(f"Request {request_id}: Sending request to {url} with payload: {payload}")
+            response = requests.post(url, headers=headers, json=payload, timeout=60)
+            response.raise_for_status()
+            return response.json()
+
+        result = pool.request(send, balance_strategy)
+        print(f"Request {request_id}: Received response")
+
+        # Extract base64 images from response
+        for img_data in result.get("data", []):
+            base64_str = img_data.get("b64_json", "")
+            if base64_str:
+                # Decode base64 string to image
+                img_bytes = base64.b64decode(base64_str)
+                img = Image.open(io.BytesIO(img_bytes))
+
+                print(f"Request {request_id}: PIL image size: {img.size}, mode: {img.mode}")
+
+                # Convert PIL image to torch tensor
+                img_array = np.array(img).astype(np.float32) / 255.0
+                print(f"Request {request_id}: Image array shape: {img_array.shape}, dtype: {img_array.dtype}")
+
+                # Create tensor with batch dimension (BHWC format)
+                img_tensor = torch.from_numpy(img_array)
+                print(f"Request {request_id}: Image tensor shape: {img_tensor.shape}, dtype: {img_tensor.dtype}")
+
+                # Ensure tensor is contiguous and on CPU
+                img_tensor = img_tensor.contiguous().cpu()
+
+                return img_tensor
+
+        raise ValueError(f"No images generated from API response for request {request_id}")
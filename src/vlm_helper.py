@@ -1,5 +1,83 @@
+import base64
+import hashlib
+import io
+import math
 import re
+import threading
+from collections import OrderedDict
+import numpy as np
 import requests
+from PIL import Image
+from .load_balancer import BALANCE_STRATEGIES, get_endpoint_pool
+
+IMAGE_FORMATS = ["JPEG", "WEBP"]
+
+# Encoded data URLs keyed by image content hash and encoding settings
+_image_cache = OrderedDict()
+_image_cache_lock = threading.Lock()
+_IMAGE_CACHE_SIZE = 64
+
+
+def _encode_image(image_np: np.ndarray, max_pixels: int, max_bytes: int, image_format: str) -> str:
+    """Encode an HWC float image as a data URL, downscaling and lowering quality until it fits the budget"""
+    img = Image.fromarray((np.clip(image_np, 0, 1) * 255).astype(np.uint8)).convert("RGB")
+
+    width, height = img.size
+    if width * height > max_pixels:
+        scale = math.sqrt(max_pixels / (width * height))
+        width, height = max(1, int(width * scale)), max(1, int(height * scale))
+        img = img.resize((width, height), Image.LANCZOS)
+
+    # Shrink by one common factor so the aspect ratio is kept, always resizing from the
+    # budget-sized image so quality does not degrade over repeated resizes
+    base_img, base_width, base_height = img, width, height
+    factor = 1.0
+    while True:
+        for quality in (85, 75, 60, 45):
+            buffer = io.BytesIO()
+            img.save(buffer, format=image_format, quality=quality)
+            data = buffer.getvalue()
+            if len(data) <= max_bytes:
+                break
+        if len(data) <= max_bytes:
+            break
+        # Lowest quality still too large: shrink the image and try again
+        if max(width, height) <= 1:
+            raise ValueError(f"Could not encode image under {max_bytes} bytes")
+        factor *= 0.75
+        width, height = max(1, round(base_width * factor)), max(1, round(base_height * factor))
+        img = base_img.resize((width, height), Image.LANCZOS)
+
+    print(f"Encoded image as {image_format} {width}x{height}, {len(data)} bytes")
+    mime = "image/jpeg" if image_format == "JPEG" else "image/webp"
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def _encode_images(image, max_pixels: int, max_bytes: int, image_format: str) -> list:
+    """Encode every item of an IMAGE batch, reusing cached results for identical content"""
+    images_np = image.cpu().numpy()
+    if images_np.ndim == 3:
+        images_np = images_np[None]
+
+    urls = []
+    for image_np in images_np:
+        image_np = np.ascontiguousarray(image_np)
+        digest = hashlib.blake2b(image_np.tobytes(), digest_size=16)
+        digest.update(str(image_np.shape).encode())
+        key = (digest.hexdigest(), max_pixels, max_bytes, image_format)
+
+        with _image_cache_lock:
+            url = _image_cache.get(key)
+            if url is not None:
+                _image_cache.move_to_end(key)
+        if url is None:
+            url = _encode_image(image_np, max_pixels, max_bytes, image_format)
+            with _image_cache_lock:
+                _image_cache[key] = url
+                while len(_image_cache) > _IMAGE_CACHE_SIZE:
+                    _image_cache.popitem(last=False)
+        urls.append(url)
+    return urls
 
 
 class VLMHelperNode:
@@ -34,71 +112,117 @@ class VLMHelperNode:
                 "api_url": ("STRING", {
                     "default": "https://dxt104.intra.moments8.com/v1/chat/completions",
                     "multiline": False,
-                    "placeholder": "API endpoint URL"
+                    "placeholder": "API endpoint URL(s), separate multiple backends with commas"
+                })
+            },
+            "optional": {
+                "balance_strategy": (BALANCE_STRATEGIES, {
+                    "default": "least_outstanding"
+                }),
+                "image": ("IMAGE",),
+                "image_max_pixels": ("INT", {
+                    "default": 1024 * 1024,
+                    "min": 64 * 64,
+                    "max": 4096 * 4096,
+                    "step": 1024,
+                    "placeholder": "Images are downscaled to at most this many pixels"
+                }),
+                "image_max_kb": ("INT", {
+                    "default": 512,
+                    "min": 16,
+                    "max": 10240,
+                    "step": 16,
+                    "placeholder": "Maximum encoded size of each image in KB"
+                }),
+                "image_format": (IMAGE_FORMATS, {
+                    "default": "JPEG"
                 })
             },
         }
 
-    RETURN_TYPES = ("STRING",)
-    RETURN_NAMES = ("processed_prompt",)
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("processed_prompt", "backend_stats")
     FUNCTION = "process_prompt"
     CATEGORY = "多信通自定义节点"
 
-    def process_prompt(self, prompt: str, model: str, system_prompt: str, api_key: str, api_url: str) -> tuple:
+    def process_prompt(self, prompt: str, model: str, system_prompt: str, api_key: str, api_url: str,
+                       balance_strategy: str = "least_outstanding", image=None, image_max_pixels: int = 1024 * 1024,
+                       image_max_kb: int = 512, image_format: str = "JPEG") -> tuple:
         """Process prompt through VLM assistant and clean the result"""
+        pool = None
         try:
+            pool = get_endpoint_pool(api_url)
 
-            # Prepare the API request payload
-            payload = {
-                "model": model,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "stream": False,
-                "temperature": 0.7,
-                "top_p": 0.8,
-                "frequency_penalty": 0,
-                "max_tokens": 4096,
-                "top_k": 20
-            }
-
-            # Prepare request headers
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {api_key}"
-            }
-
-            print(f"Sending request to {api_url} with prompt: {prompt[:100]}...")
-
-            # Make API request
-            response = requests.post(api_url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
-
-            result = response.json()
-            print(f"Received response: {result}")
+            image_urls = None
+            if image is not None:
+                image_urls = _encode_images(image, image_max_pixels, image_max_kb * 1024, image_format)
 
-            # Extract content from response (based on return.json structure)
-            if "choices" in result and len(result["choices"]) > 0:
-                message_content = result["choices"][0]["message"]["content"]
+            cleaned_prompt = self._request_completion(pool, balance_strategy, prompt, model, system_prompt, api_key,
+                                                      image_urls)
+            if cleaned_prompt is None:
+                return (f"Error: No response from VLM API", pool.stats_json())
 
-                # Clean the content by removing <thinking> tags and their content
-                cleaned_prompt = self._remove_thinking_tags(message_content)
-
-                print(f"Cleaned prompt: {cleaned_prompt}")
-                return (cleaned_prompt,)
-            else:
-                return (f"Error: No response from VLM API",)
+            print(f"Cleaned prompt: {cleaned_prompt}")
+            return (cleaned_prompt, pool.stats_json())
 
         except Exception as e:
             print(f"Error processing prompt with VLM: {str(e)}")
-            return (f"Error: {str(e)}",)
+            return (f"Error: {str(e)}", pool.stats_json() if pool else "[]")
+
+    def _request_completion(self, pool, balance_strategy: str, prompt: str, model: str, system_prompt: str,
+                            api_key: str, image_urls: list = None):
+        """Send a chat completion request and return the cleaned content, or None if there is no choice"""
+        # Images go first in the user message, followed by the text prompt
+        user_content = prompt
+        if image_urls:
+            user_content = [{"type": "image_url", "image_url": {"url": url}} for url in image_urls]
+            user_content.append({"type": "text", "text": prompt})
+
+        # Prepare the API request payload
+        payload = {
+            "model": model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": system_prompt
+                },
+                {
+                    "role": "user",
+                    "content": user_content
+                }
+            ],
+            "stream": False,
+            "temperature": 0.7,
+            "top_p": 0.8,
+            "frequency_penalty": 0,
+            "max_tokens": 4096,
+            "top_k": 20
+        }
+
+        # Prepare request headers
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}"
+        }
+
+        def send(url):
+            print(f"Sending request to {url} with prompt: {prompt[:100]}...")
+            response = requests.post(url, headers=headers, json=payload, timeout=60)
+            response.raise_for_status()
+            return response.json()
+
+        # Make API request on one of the configured backends
+        result = pool.request(send, balance_strategy)
+        print(f"Received response: {result}")
+
+        # Extract content from response (based on return.json structure)
+        if "choices" in result and len(result["choices"]) > 0:
+            message_content = result["choices"][0]["message"]["content"]
+
+            # Clean the content by removing <thinking> tags and their content
+            return self._remove_thinking_tags(message_content)
+
+        return None
 
     def _remove_thinking_tags(self, text: str) -> str:
         """Remove thinking tags and their content from text"""